@@ -1,8 +1,14 @@
+import hashlib
+import json
+import os
 import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from bs4 import BeautifulSoup
-import pytz
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser
+from urllib3.util.retry import Retry
+from zoneinfo import ZoneInfo
 
 # --- Sources ---
 
@@ -11,6 +17,8 @@ BEA_URL = "https://www.bea.gov/news/schedule/ics/online-calendar-subscription.ic
 FOMC_URL = "https://www.federalreserve.gov/monetarypolicy/fomccalendars.htm"
 
 NOW = datetime.now(timezone.utc)
+# NOW in ICS UTC form; fixed-width keys compare correctly as strings
+NOW_KEY = NOW.strftime("%Y%m%dT%H%M%SZ").encode("ascii")
 
 # Major macro keywords to keep from BLS/BEA
 MAJOR_KEYWORDS = [
@@ -21,6 +29,20 @@ MAJOR_KEYWORDS = [
     "Personal Income and Outlays",  # PCE-ish
 ]
 
+# BLS/BEA ICS lines are filtered as raw bytes (only kept events get
+# decoded), so the keyword and DTSTART patterns are bytes patterns.
+
+# Single alternation so each line is scanned once by the regex engine
+KEYWORD_RE = re.compile(
+    b"|".join(re.escape(k.encode("ascii")) for k in MAJOR_KEYWORDS)
+)
+
+# DTSTART with optional parameters, capturing the date and optional time
+_DTSTART_RE = re.compile(rb"^DTSTART(?:;[^:]*)?:(\d{8})(?:T(\d{6})Z?)?\s*$")
+
+# BLS local-time DTSTART/DTEND, capturing the property name and timestamp
+_TZ_RE = re.compile(r"^(DTSTART|DTEND);TZID=US-Eastern:(\d{8}T\d{6})\s*$")
+
 MONTH_MAP = {
     "January": 1,
     "February": 2,
@@ -36,151 +58,293 @@ MONTH_MAP = {
     "December": 12,
 }
 
-EASTERN = pytz.timezone("US/Eastern")
-
+# One 'YYYY FOMC Meetings' section: the year and everything up to the next
+# year header (or end of text)
+SECTION_RE = re.compile(
+    r"(\d{4}) FOMC Meetings(.*?)(?=\d{4} FOMC Meetings|\Z)", re.DOTALL
+)
 
-# ---------- Helpers for ICS parsing (BLS/BEA) ----------
+EASTERN = ZoneInfo("America/New_York")
 
-def fetch_lines(url: str):
-    # User-Agent to avoid 403s from BLS/BEA
-    headers = {
+# Shared HTTP session: keep-alive / connection pooling across all fetches,
+# with retry + backoff on transient upstream errors.
+SESSION = requests.Session()
+# User-Agent to avoid 403s from BLS/BEA
+SESSION.headers.update(
+    {
         "User-Agent": (
             "Mozilla/5.0 (X11; Linux x86_64) "
             "AppleWebKit/537.36 (KHTML, like Gecko) "
             "Chrome/122.0 Safari/537.36"
         ),
-        "Accept": "text/calendar,text/plain,*/*",
+        "Accept": "text/calendar,text/html,text/plain,*/*",
     }
-    resp = requests.get(url, headers=headers, timeout=30)
+)
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=10,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+        ),
+    ),
+)
+
+# Validators (ETag / Last-Modified) and bodies from the previous run, so an
+# unchanged source costs a 304 instead of a full download.
+HTTP_CACHE_DIR = ".http_cache"
+HTTP_CACHE_INDEX = os.path.join(HTTP_CACHE_DIR, "cache.json")
+HTTP_CACHE = {}  # url -> {"etag": ..., "last_modified": ...}
+
+
+# ---------- HTTP cache (conditional GETs across runs) ----------
+
+def load_http_cache():
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    try:
+        with open(HTTP_CACHE_INDEX, encoding="utf-8") as f:
+            HTTP_CACHE.update(json.load(f))
+    except (OSError, ValueError):
+        # Missing or corrupt index: start cold
+        pass
+
+
+def save_http_cache():
+    with open(HTTP_CACHE_INDEX, "w", encoding="utf-8") as f:
+        json.dump(HTTP_CACHE, f, indent=2, sort_keys=True)
+
+
+def cache_body_path(url: str):
+    return os.path.join(
+        HTTP_CACHE_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".body"
+    )
+
+
+def conditional_get(url: str, **kwargs):
+    """
+    GET url with If-None-Match / If-Modified-Since from the previous run.
+    Returns the response, or None on 304 (use the cached body instead).
+    """
+    headers = {}
+    entry = HTTP_CACHE.get(url)
+    if entry and os.path.exists(cache_body_path(url)):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    resp = SESSION.get(url, headers=headers, timeout=30, **kwargs)
+    if resp.status_code == 304:
+        resp.close()
+        return None
     resp.raise_for_status()
-    return resp.text.splitlines()
+    return resp
+
+
+def remember_response(url: str, resp):
+    """
+    Record the validators of a 200 response whose body is now on disk.
+    """
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if etag or last_modified:
+        HTTP_CACHE[url] = {"etag": etag, "last_modified": last_modified}
+    else:
+        HTTP_CACHE.pop(url, None)
+
+
+# ---------- Helpers for ICS parsing (BLS/BEA) ----------
+
+def fetch_lines(url: str):
+    """
+    Stream the ICS body and yield raw (undecoded) byte lines lazily, so the
+    whole response is never held in memory at once. Served from the
+    on-disk copy when the server says it hasn't changed.
+    """
+    resp = conditional_get(url, stream=True)
+    if resp is None:
+        return read_cached_lines(cache_body_path(url))
+    return tee_lines(url, resp)
+
+
+def read_cached_lines(path: str):
+    with open(path, "rb") as f:
+        for line in f:
+            yield line.rstrip(b"\r\n")
 
 
-def parse_dtstart(line: str):
+def tee_lines(url: str, resp):
     """
-    Parses a DTSTART line into a datetime in UTC (best effort).
+    Yield the response lines while also writing them to the cache; the
+    cache entry is only committed once the whole body has been read.
+    """
+    path = cache_body_path(url)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        # iter_lines can yield a spurious empty line when a CRLF straddles a
+        # chunk boundary; blank lines carry no meaning in ICS, so drop them.
+        for line in resp.iter_lines(chunk_size=64 * 1024):
+            if line:
+                f.write(line + b"\n")
+                yield line
+    os.replace(tmp, path)
+    remember_response(url, resp)
+
+
+def dtstart_key(line: bytes):
+    """
+    Turns a raw (bytes) DTSTART line into a YYYYMMDDTHHMMSSZ key that can be
+    compared against NOW_KEY directly, without building a datetime.
     Handles:
       DTSTART;VALUE=DATE-TIME:20250107T133000Z
       DTSTART;VALUE=DATE:20260128
       DTSTART;TZID=US-Eastern:20260109T083000
       DTSTART:20250425T180000Z
+    Date-only values map to midnight. Floating local times are treated as
+    UTC (we only use the key for >= NOW filtering); timezone-specific
+    normalization happens later where needed.
     """
-    if ":" not in line:
+    m = _DTSTART_RE.match(line)
+    if m is None:
         return None
-    value = line.split(":", 1)[1].strip()
-    try:
-        if "T" in value:
-            # Has time
-            if value.endswith("Z"):
-                dt = datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(
-                    tzinfo=timezone.utc
-                )
-            else:
-                # Treat as naive UTC here (we only use it for >= NOW filtering);
-                # timezone-specific normalization happens later where needed.
-                dt = datetime.strptime(value, "%Y%m%dT%H%M%S").replace(
-                    tzinfo=timezone.utc
-                )
-        else:
-            # Date only
-            dt = datetime.strptime(value, "%Y%m%d").replace(tzinfo=timezone.utc)
-        return dt
-    except Exception:
-        return None
-
-
-def annotate_source(event_lines, source_tag):
-    """
-    Add a source marker (BLS / BEA) into DESCRIPTION or as COMMENT.
-    """
-    out = []
-    inserted = False
-    for line in event_lines:
-        out.append(line)
-        if not inserted and line.startswith("DESCRIPTION:"):
-            out.append(f"  (Source: {source_tag})")
-            inserted = True
-    if not inserted:
-        out.insert(1, f"COMMENT:Source={source_tag}")
-    return out
+    date, time = m.groups()
+    return date + b"T" + (time or b"000000") + b"Z"
 
 
 def filter_events(lines, source_tag):
     """
     Pull VEVENT blocks from an ICS file, keep only those with
     MAJOR_KEYWORDS in any line, and only for dates >= NOW.
+    Takes raw byte lines; returns kept events as decoded str lines, with a
+    source marker (BLS / BEA) added to DESCRIPTION or as a COMMENT.
     """
     events = []
     current = []
     in_event = False
     include = False
-    event_dt = None
-
-    for line in lines:
-        if line.startswith("BEGIN:VEVENT"):
+    event_key = None
+    description_idx = -1
+    _kw_search = KEYWORD_RE.search
+    # Fixed-length prefixes: a slice compare is cheaper than a method call
+    _BEGIN, _END, _DTSTART = b"BEGIN:VEVENT", b"END:VEVENT", b"DTSTART"
+    _DESCRIPTION = b"DESCRIPTION:"
+
+    lines_iter = iter(lines)
+    for line in lines_iter:
+        if line[:12] == _BEGIN:
             in_event = True
             current = [line]
             include = False
-            event_dt = None
-        elif line.startswith("END:VEVENT"):
-            current.append(line)
-            if include and (event_dt is None or event_dt >= NOW):
-                events.append(annotate_source(current, source_tag))
-            in_event = False
-            current = []
-            event_dt = None
-        elif in_event:
-            if line.startswith("DTSTART"):
-                dt = parse_dtstart(line)
-                if dt is not None:
-                    event_dt = dt
-            if any(k in line for k in MAJOR_KEYWORDS):
-                include = True
-            current.append(line)
-        else:
+            event_key = None
+            description_idx = -1
+            continue
+        if not in_event:
             # ignore non-event lines
             continue
 
+        current.append(line)
+        if line[:10] != _END:
+            if line[:7] == _DTSTART:
+                key = dtstart_key(line)
+                if key is None:
+                    continue
+                event_key = key
+            else:
+                if description_idx < 0 and line[:12] == _DESCRIPTION:
+                    description_idx = len(current) - 1
+                if include or _kw_search(line) is None:
+                    continue
+                include = True
+
+            if not include or event_key is None or event_key < NOW_KEY:
+                continue
+
+            # Keyword matched and start date is upcoming: the event is kept,
+            # so copy the rest of it through, only noting DESCRIPTION.
+            for line in lines_iter:
+                if line[:12] == _BEGIN:
+                    break
+                current.append(line)
+                if line[:10] == _END:
+                    break
+                if description_idx < 0 and line[:12] == _DESCRIPTION:
+                    description_idx = len(current) - 1
+            else:
+                # Feed ended mid-event
+                break
+
+            if line[:12] == _BEGIN:
+                # Kept event had no END:VEVENT: drop it and resync on the
+                # new event, as the outer loop does
+                current = [line]
+                include = False
+                event_key = None
+                description_idx = -1
+                continue
+
+        # END:VEVENT
+        in_event = False
+        if include and (event_key is None or event_key >= NOW_KEY):
+            ev = [raw.decode("utf-8", errors="replace") for raw in current]
+            if description_idx >= 0:
+                ev.insert(description_idx + 1, f"  (Source: {source_tag})")
+            else:
+                ev.insert(1, f"COMMENT:Source={source_tag}")
+            events.append(ev)
+
     return events
 
 
+def fetch_events(url: str, source_tag):
+    """
+    Fetch and filter one ICS source. The body is streamed and consumed
+    here, so when run in a worker thread the downloads overlap fully.
+    """
+    return filter_events(fetch_lines(url), source_tag)
+
+
 def normalize_bls_events_to_utc(events):
     """
     For events sourced from BLS, convert any
-    DTSTART;TZID=US-Eastern:YYYYMMDDTHHMMSS
+    DTSTART/DTEND;TZID=US-Eastern:YYYYMMDDTHHMMSS
     to plain UTC like:
-    DTSTART:YYYYMMDDTHHMMSSZ
+    DTSTART/DTEND:YYYYMMDDTHHMMSSZ
 
     We don't touch all-day VALUE=DATE events.
     """
+    _utc = timezone.utc
+    _eastern = EASTERN
+    _tz_match = _TZ_RE.match
     normalized = []
     for ev in events:
         new_ev = []
+        append = new_ev.append
         for line in ev:
-            if line.startswith("DTSTART;TZID=US-Eastern:"):
-                val = line.split(":", 1)[1].strip()
-                # BLS uses times like 20260109T083000
-                try:
-                    local_naive = datetime.strptime(val, "%Y%m%dT%H%M%S")
-                    local_dt = EASTERN.localize(local_naive)
-                    utc_dt = local_dt.astimezone(timezone.utc)
-                    new_line = "DTSTART:" + utc_dt.strftime("%Y%m%dT%H%M%SZ")
-                    new_ev.append(new_line)
-                except Exception:
-                    # Fall back to original line if parsing fails
-                    new_ev.append(line)
-            elif line.startswith("DTEND;TZID=US-Eastern:"):
-                val = line.split(":", 1)[1].strip()
-                try:
-                    local_naive = datetime.strptime(val, "%Y%m%dT%H%M%S")
-                    local_dt = EASTERN.localize(local_naive)
-                    utc_dt = local_dt.astimezone(timezone.utc)
-                    new_line = "DTEND:" + utc_dt.strftime("%Y%m%dT%H%M%SZ")
-                    new_ev.append(new_line)
-                except Exception:
-                    new_ev.append(line)
-            else:
-                new_ev.append(line)
+            m = _tz_match(line)
+            if m is None:
+                append(line)
+                continue
+            kind, val = m.group(1), m.group(2)
+            # BLS uses times like 20260109T083000; slice the fixed-width
+            # digits directly rather than going through strptime.
+            try:
+                local_dt = datetime(
+                    int(val[0:4]),
+                    int(val[4:6]),
+                    int(val[6:8]),
+                    int(val[9:11]),
+                    int(val[11:13]),
+                    int(val[13:15]),
+                    tzinfo=_eastern,
+                )
+                utc_dt = local_dt.astimezone(_utc)
+                append(f"{kind}:{utc_dt:%Y%m%dT%H%M%SZ}")
+            except ValueError:
+                # Fall back to original line if the date is out of range
+                append(line)
         normalized.append(new_ev)
     return normalized
 
@@ -194,30 +358,36 @@ def scrape_fomc_events():
     a hard-coded year list.
 
     Steps:
-      - fetch the page
-      - detect all year headers like '2026 FOMC Meetings'
-      - for each year section, find patterns: 'Month  DD-DD' (optional '*')
+      - fetch the page (or reuse the cached copy if unchanged)
+      - split the text into 'YYYY FOMC Meetings' sections in one regex pass
+      - for each current/future year section, find patterns: 'Month  DD-DD' (optional '*')
       - use the SECOND day as the policy decision date
       - make all-day events for those dates, only if >= NOW
       - deduplicate meeting dates in case the pattern appears more than once
     """
-    resp = requests.get(FOMC_URL, timeout=30)
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
-    text = soup.get_text("\n")
+    resp = conditional_get(FOMC_URL)
+    body_path = cache_body_path(FOMC_URL)
+    if resp is None:
+        with open(body_path, encoding="utf-8") as f:
+            html = f.read()
+    else:
+        html = resp.text
+        with open(body_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        remember_response(FOMC_URL, resp)
+
+    # Only the flattened page text is needed, so use the C-backed lexbor
+    # parser and drop script/style bodies before extracting it. strip=True
+    # drops the indentation between tags (as bs4's get_text did), which
+    # would otherwise push day ranges out of month_re's reach.
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(["script", "style"])
+    text = tree.text(separator="\n", strip=True)
 
     now_str = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
 
-    # 1) Find all 'YYYY FOMC Meetings' headers dynamically
-    year_header_re = re.compile(r"(\d{4}) FOMC Meetings")
-    year_matches = list(year_header_re.finditer(text))
-
-    # Extract years and keep them sorted & unique
-    years_to_scan = sorted({int(m.group(1)) for m in year_matches})
-
-    # Optionally, only scan years from "now on" to avoid ancient data
+    # Only scan years from "now on" to avoid ancient data
     current_year = datetime.now(timezone.utc).year
-    years_to_scan = [y for y in years_to_scan if y >= current_year]
 
     # Precompile month+day-range pattern, e.g. "January 27-28*"
     month_pattern = (
@@ -227,28 +397,27 @@ def scrape_fomc_events():
     )
     month_re = re.compile(month_pattern)
 
+    # Event lines that don't depend on the meeting date
+    dtstamp = f"DTSTAMP:{now_str}"
+    summary = "SUMMARY:FOMC Meeting – Rate Decision"
+    desc_prefix = (
+        "DESCRIPTION:Federal Open Market Committee meeting "
+        "(second day, policy statement expected). "
+        "(Source: Federal Reserve FOMC calendar, "
+    )
+
     events = []
     seen_dates = set()  # YYYYMMDD strings to avoid duplicates
 
-    for year in years_to_scan:
-        header = f"{year} FOMC Meetings"
-        idx = text.find(header)
-        if idx == -1:
+    # Single pass over the page: each match is one year header plus the
+    # text up to the next header, so section bounds come for free.
+    for sec in SECTION_RE.finditer(text):
+        year = int(sec.group(1))
+        if year < current_year:
             continue
+        description = f"{desc_prefix}{year})"
 
-        # Bound this section by the next year's header or end of text
-        end_idx = len(text)
-        for other_year in years_to_scan:
-            if other_year <= year:
-                continue
-            other_header = f"{other_year} FOMC Meetings"
-            tmp = text.find(other_header)
-            if tmp != -1 and tmp > idx:
-                end_idx = min(end_idx, tmp)
-
-        section = text[idx:end_idx]
-
-        for m in month_re.finditer(section):
+        for m in month_re.finditer(sec.group(2)):
             month_name, _day1_str, day2_str = m.groups()
             month = MONTH_MAP[month_name]
             day2 = int(day2_str)
@@ -267,19 +436,17 @@ def scrape_fomc_events():
                 continue
             seen_dates.add(date_key)
 
-            uid = f"FOMC-{date_key}@us-macro"
-            ev = [
-                "BEGIN:VEVENT",
-                f"UID:{uid}",
-                f"DTSTAMP:{now_str}",
-                f"DTSTART;VALUE=DATE:{date_key}",
-                "SUMMARY:FOMC Meeting – Rate Decision",
-                "DESCRIPTION:Federal Open Market Committee meeting "
-                "(second day, policy statement expected). "
-                f"(Source: Federal Reserve FOMC calendar, {year})",
-                "END:VEVENT",
-            ]
-            events.append(ev)
+            events.append(
+                [
+                    "BEGIN:VEVENT",
+                    f"UID:FOMC-{date_key}@us-macro",
+                    dtstamp,
+                    f"DTSTART;VALUE=DATE:{date_key}",
+                    summary,
+                    description,
+                    "END:VEVENT",
+                ]
+            )
 
     return events
 
@@ -287,18 +454,26 @@ def scrape_fomc_events():
 # ---------- Main entrypoint ----------
 
 def main():
-    # BLS & BEA events
-    bls_lines = fetch_lines(BLS_URL)
-    bea_lines = fetch_lines(BEA_URL)
+    load_http_cache()
+
+    # The three sources live on different hosts and are independent, so
+    # fetch them concurrently over the shared session.
+    with SESSION, ThreadPoolExecutor(max_workers=3) as ex:
+        # BLS & BEA events
+        f_bls = ex.submit(fetch_events, BLS_URL, "BLS")
+        f_bea = ex.submit(fetch_events, BEA_URL, "BEA")
+        # Fed FOMC meetings scraped live
+        f_fomc = ex.submit(scrape_fomc_events)
+
+        bls_events = f_bls.result()
+        bea_events = f_bea.result()
 
-    bls_events = filter_events(bls_lines, "BLS")
-    bea_events = filter_events(bea_lines, "BEA")
+        # Normalize BLS events so DTSTART is UTC, no TZID=US-Eastern
+        bls_events = normalize_bls_events_to_utc(bls_events)
 
-    # Normalize BLS events so DTSTART is UTC, no TZID=US-Eastern
-    bls_events = normalize_bls_events_to_utc(bls_events)
+        fomc_events = f_fomc.result()
 
-    # Fed FOMC meetings scraped live
-    fomc_events = scrape_fomc_events()
+    save_http_cache()
 
     header = [
         "BEGIN:VCALENDAR",
@@ -310,14 +485,17 @@ def main():
     ]
     footer = ["END:VCALENDAR"]
 
-    with open("us_macro.ics", "w", encoding="utf-8") as f:
-        for line in header:
-            f.write(line + "\n")
-        for ev in bls_events + bea_events + fomc_events:
-            for l in ev:
-                f.write(l + "\n")
-        for line in footer:
-            f.write(line + "\n")
+    # Assemble the whole calendar in memory and write it in one call
+    out = list(header)
+    for ev in bls_events + bea_events + fomc_events:
+        out.extend(ev)
+    out.extend(footer)
+    out.append("")  # trailing newline
+
+    # RFC 5545 requires CRLF line endings; emit them explicitly and disable
+    # newline translation so the output is identical on every platform.
+    with open("us_macro.ics", "w", encoding="utf-8", newline="") as f:
+        f.write("\r\n".join(out))
 
 
 if __name__ == "__main__":
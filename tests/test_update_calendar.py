@@ -0,0 +1,98 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "update_calendar.py"
+
+
+@pytest.fixture
+def cal():
+    spec = importlib.util.spec_from_file_location("update_calendar", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Fed-style markup: month and day range sit in sibling divs, indented deeply
+FOMC_HTML = """<html><body>
+<div class="panel">
+    <div class="panel-heading"><h4><a id="1">2099 FOMC Meetings</a></h4></div>
+                        <div class="row fomc-meeting">
+                        <div class="fomc-meeting__month col-xs-5"><strong>January</strong></div>
+                        <div class="fomc-meeting__date col-xs-4">27-28</div>
+                        </div>
+                        <div class="row fomc-meeting">
+                        <div class="fomc-meeting__month col-xs-5"><strong>December</strong></div>
+                        <div class="fomc-meeting__date col-xs-4">8-9*</div>
+                        </div>
+</div>
+<div class="panel">
+    <div class="panel-heading"><h4><a id="2">2098 FOMC Meetings</a></h4></div>
+<div class="fomc-meeting__month"><strong>March</strong></div><div class="fomc-meeting__date">16-17</div>
+</div>
+</body></html>
+"""
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+def test_scrape_fomc_events_indented_markup(cal, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / cal.HTTP_CACHE_DIR).mkdir()
+    monkeypatch.setattr(
+        cal.SESSION, "get", lambda *a, **k: FakeResponse(FOMC_HTML)
+    )
+
+    events = cal.scrape_fomc_events()
+
+    dtstarts = sorted(ev[3] for ev in events)
+    assert dtstarts == [
+        "DTSTART;VALUE=DATE:20980317",
+        "DTSTART;VALUE=DATE:20990128",
+        "DTSTART;VALUE=DATE:20991209",
+    ]
+
+
+def test_filter_events_resyncs_on_unterminated_event(cal):
+    lines = [
+        b"BEGIN:VEVENT",
+        b"UID:1",
+        b"DTSTART:20990101T133000Z",
+        b"SUMMARY:Consumer Price Index",
+        # END:VEVENT missing
+        b"BEGIN:VEVENT",
+        b"UID:2",
+        b"DTSTART:20990102T133000Z",
+        b"SUMMARY:Unrelated release",
+        b"END:VEVENT",
+        b"BEGIN:VEVENT",
+        b"UID:3",
+        b"DTSTART:20990103T133000Z",
+        b"SUMMARY:Gross Domestic Product",
+        b"DESCRIPTION:GDP",
+        b"END:VEVENT",
+    ]
+
+    events = cal.filter_events(lines, "BEA")
+
+    assert events == [
+        [
+            "BEGIN:VEVENT",
+            "UID:3",
+            "DTSTART:20990103T133000Z",
+            "SUMMARY:Gross Domestic Product",
+            "DESCRIPTION:GDP",
+            "  (Source: BEA)",
+            "END:VEVENT",
+        ]
+    ]